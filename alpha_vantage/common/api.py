@@ -1,16 +1,59 @@
+import functools
 import logging
+import queue
+import threading
 import urllib.parse
 from abc import ABC
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple, Type
 
 import pandas as pd
 from sqlite_forge.database import SqliteDatabase
 
-from alpha_vantage import DATABASE_PATH
+from alpha_vantage import DATABASE_PATH, REPO_PATH
+from alpha_vantage.common.cache import FileCache
 from alpha_vantage.common.key_manager import APIKeyManager
 
+try:
+    import adbc_driver_sqlite.dbapi as adbc_sqlite
+    import pyarrow as pa
+except ImportError:
+    adbc_sqlite = None
+
 log = logging.getLogger(__name__)
 
+# Whether the optional Arrow stack is installed, enabling columnar ingestion through ADBC
+ARROW_AVAILABLE: bool = adbc_sqlite is not None
+
+
+@functools.lru_cache(maxsize=64)
+def url_prefix(base_url: str, api_key: str) -> str:
+    """
+    Return the encoded, key-specific prefix shared by every request URL for an API key.
+
+    Args:
+        base_url (str): The base URL of the API.
+        api_key (str): The API key to embed.
+
+    Returns:
+        str: The URL up to and including the `apikey` query parameter.
+    """
+    return f"{base_url}?apikey={urllib.parse.quote(api_key)}"
+
+
+@functools.lru_cache(maxsize=1024)
+def encode_params(params: Tuple[Tuple[str, Any], ...]) -> str:
+    """
+    Encode sorted request parameters into a query string, caching repeated parameter sets.
+
+    Args:
+        params (Tuple[Tuple[str, Any], ...]): Sorted (name, value) pairs.
+
+    Returns:
+        str: The encoded query string.
+    """
+    return urllib.parse.urlencode(params)
+
 
 class APIRequestError(Exception):
     """
@@ -34,13 +77,29 @@ class AlphaVantageAPI(APIKeyManager, ABC):
 
     Attributes:
         BASE_URL (str): The base URL for the Alpha Vantage API.
+        MAX_WORKERS (int): Maximum number of threads used by `make_requests`.
+        CACHE_DIR (Optional[str]): Root of the on-disk response cache, or None to disable caching.
 
     Methods:
         build_url_request(function: str, **kwargs) -> str:
             Builds and returns the complete URL for making an API request to Alpha Vantage.
+
+        make_request(url: str, api_key: Optional[str] = None) -> Dict:
+            Makes an API request, serving repeated requests from the on-disk cache.
+
+        make_requests(requests_kwargs: List[Dict]) -> List[Dict]:
+            Makes several independent API requests concurrently, one API key per worker thread.
     """
 
     BASE_URL: str = "https://www.alphavantage.co/query"
+    MAX_WORKERS: int = 8
+    CACHE_DIR: Optional[str] = f"{REPO_PATH}/.cache"
+
+    # Table handlers opened so far, keyed on their SqliteDatabase class
+    _database_handlers: Dict[Type[SqliteDatabase], SqliteDatabase] = {}
+
+    # API key pinned to the current worker thread by `_pinned_executor`
+    _pinned = threading.local()
 
     def __init__(self, *args, **kwargs):
         """
@@ -52,46 +111,257 @@ class AlphaVantageAPI(APIKeyManager, ABC):
         """
         super().__init__(*args, **kwargs)
 
+    @functools.cached_property
+    def cache(self) -> Optional[FileCache]:
+        """
+        Return the on-disk response cache, or None if caching is disabled.
+
+        Returns:
+            Optional[FileCache]: The response cache.
+        """
+        return FileCache(self.CACHE_DIR) if self.CACHE_DIR else None
+
+    @property
+    def request_key(self) -> str:
+        """
+        Return the API key requests made on the current thread should use.
+
+        Returns:
+            str: The key pinned to this thread, or the current key if none is pinned or it has been retired.
+        """
+        api_key = getattr(self._pinned, 'api_key', None)
+        return api_key if api_key in self.active_keys else self.api_key
+
+    def _pinned_executor(self, max_workers: int) -> ThreadPoolExecutor:
+        """
+        Return a thread pool whose worker threads are each pinned to a distinct active API key.
+
+        Requests made on a worker thread default to its pinned key, so concurrent workers never queue behind
+        each other on the same key. The number of workers is bounded by the number of active keys.
+
+        Args:
+            max_workers (int): The maximum number of worker threads.
+
+        Returns:
+            ThreadPoolExecutor: The thread pool.
+        """
+        with self._lock:
+            self.ensure_active_keys()
+            keys = queue.Queue()
+            for api_key in self.active_keys:
+                keys.put(api_key)
+
+        def pin_key():
+            self._pinned.api_key = keys.get_nowait()
+
+        return ThreadPoolExecutor(max_workers=max(1, min(max_workers, keys.qsize())), initializer=pin_key)
+
     def build_url_request(self, function: str, **kwargs) -> str:
         """
         Build the URL for the Alpha Vantage API request.
 
         Args:
             function (str): The function name to retrieve specific data (e.g., 'TIME_SERIES_INTRADAY').
-            **kwargs: Additional parameters to include in the API request.
+            **kwargs: Additional parameters to include in the API request. An `apikey` entry overrides the
+                key given by `request_key`.
 
         Returns:
             str: The complete URL for the API request, including all query parameters.
         """
-        # Create a dictionary for query parameters
-        params = {
-            "function": function,
-            "apikey": self.api_key,
-        }
-
-        # Update the params dictionary with any additional keyword arguments (kwargs)
-        params.update(kwargs)
+        # An explicit `apikey` pins the request to that key rather than the one for this thread
+        api_key = kwargs.pop("apikey", None) or self.request_key
+        params = tuple(sorted({"function": function, **kwargs}.items()))
 
         # Encode the parameters and construct the full URL
-        url = f"{self.BASE_URL}?{urllib.parse.urlencode(params)}"
-        log.info(f"URL built: {url}")
+        url = f"{url_prefix(self.BASE_URL, api_key)}&{encode_params(params)}"
+        log.info("URL built: %s", url)
 
         return url
 
+    def make_request(self, url: str, api_key: Optional[str] = None) -> Dict:
+        """
+        Make an API request, returning the cached response if one is still fresh.
+
+        Args:
+            url (str): The URL to request.
+            api_key (Optional[str]): The API key the URL was built with. Defaults to `request_key`.
+
+        Returns:
+            Dict: The parsed JSON data from the API response.
+        """
+        fetch = functools.partial(super().make_request, url=url, api_key=api_key or self.request_key)
+        if self.cache is None:
+            return fetch()
+        return self.cache.get_or_set(url, fetch)
+
+    def make_requests(self, requests_kwargs: List[Dict]) -> List[Dict]:
+        """
+        Make several independent API requests concurrently.
+
+        Each worker thread is pinned to a distinct active API key, so the number of workers is bounded
+        by the number of active keys as well as `MAX_WORKERS`. Results are returned in the same order
+        as the requests.
+
+        Args:
+            requests_kwargs (List[Dict]): Query parameters for each request, as passed to `build_url_request`.
+
+        Returns:
+            List[Dict]: Parsed JSON data for each request.
+        """
+        def fetch(kwargs: Dict) -> Dict:
+            # Read the key once so the URL and the request agree even if the pinned key is retired meanwhile
+            api_key = self.request_key
+            url = self.build_url_request(apikey=api_key, **kwargs)
+            return self.make_request(url=url, api_key=api_key)
+
+        results = [None] * len(requests_kwargs)
+        with self._pinned_executor(max_workers=min(len(requests_kwargs), self.MAX_WORKERS)) as executor:
+            futures = {executor.submit(fetch, kwargs): i for i, kwargs in enumerate(requests_kwargs)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+        return results
+
+    def get_database(self, database: Type[SqliteDatabase]) -> SqliteDatabase:
+        """
+        Return the table handler for the given database class, creating the table on first use.
+
+        The handler is cached so that repeated ingests for the same table do not re-instantiate it
+        or re-run the table existence check.
+
+        Args:
+            database (Type[SqliteDatabase]): The table class to open.
+
+        Returns:
+            SqliteDatabase: An initialised handler for the table.
+        """
+        if database not in self._database_handlers:
+            # Define the database path, either from the environment or defaulting to a relative path
+            database_inst = database(database_path=f"{DATABASE_PATH}/")
+
+            # Create the table if it doesn't exist
+            database_inst.create_table()
+            self._database_handlers[database] = database_inst
+
+        return self._database_handlers[database]
+
     @staticmethod
-    def ingest_dataframe(df: pd.DataFrame, database: SqliteDatabase):
+    def _ingest_rows(df: pd.DataFrame, database_inst: SqliteDatabase) -> int:
+        """
+        Insert DataFrame rows with a single `executemany` inside an explicit BEGIN/COMMIT block.
 
-        # Define the database path, either from the environment or defaulting to a relative path
-        database_path = f"{DATABASE_PATH}/"
+        Args:
+            df (pd.DataFrame): The data to insert.
+            database_inst (SqliteDatabase): The handler for the target table.
+
+        Returns:
+            int: The number of rows written.
+        """
+        headers = df.columns.tolist()
+        insert_query = (
+            f"INSERT OR IGNORE INTO {database_inst.db_name} ({', '.join(headers)}) "
+            f"VALUES ({', '.join(['?'] * len(headers))})"
+        )
 
-        # Initialise the database table handler
-        database_inst = database(database_path=database_path)
+        conn = database_inst.conn
+        try:
+            # Bulk load settings, these only apply to this connection
+            conn.execute("PRAGMA journal_mode=MEMORY")
+            conn.execute("PRAGMA synchronous=OFF")
 
-        # Create the table if it doesn't exist and insert the data
-        database_inst.create_table()
+            conn.execute("BEGIN")
+            cursor = conn.executemany(insert_query, df.itertuples(index=False, name=None))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        return cursor.rowcount
+
+    @staticmethod
+    def _ingest_arrow(df: pd.DataFrame, database_inst: SqliteDatabase) -> int:
+        """
+        Insert a DataFrame as an Arrow table through ADBC, in a single transaction.
+
+        The table is bulk loaded into a temporary staging table and then copied across with
+        INSERT OR IGNORE, so rows with existing primary keys are still skipped.
+
+        Args:
+            df (pd.DataFrame): The data to insert.
+            database_inst (SqliteDatabase): The handler for the target table.
+
+        Returns:
+            int: The number of rows written.
+        """
+        columns = ', '.join(df.columns)
+        staging_table = f"{database_inst.db_name}_STAGING"
+        arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+
+        with adbc_sqlite.connect(database_inst.database) as conn, conn.cursor() as cursor:
+            cursor.adbc_ingest(staging_table, arrow_table, mode='replace', temporary=True)
+            cursor.execute(
+                f"INSERT OR IGNORE INTO {database_inst.db_name} ({columns}) SELECT {columns} FROM {staging_table}")
+            cursor.execute("SELECT changes()")
+            rows_written = cursor.fetchone()[0]
+            conn.commit()
+
+        return rows_written
+
+    def ingest_dataframe(self, df: pd.DataFrame, database: Type[SqliteDatabase]):
+        """
+        Insert a DataFrame into its SQLite table within a single transaction.
+
+        When the optional Arrow stack is installed the frame is loaded columnar through ADBC, otherwise rows
+        are written with one `executemany` call. Rows whose primary key already exists in the table are
+        skipped, as with `SqliteDatabase.ingest_dataframe`.
+
+        Args:
+            df (pd.DataFrame): The data to insert.
+            database (Type[SqliteDatabase]): The table class the data belongs to.
+        """
+        database_inst = self.get_database(database)
 
         if 'TIMESTAMP' in df:
             # Format to string for sqlite
             df['TIMESTAMP'] = df['TIMESTAMP'].astype(str)
 
-        database_inst.ingest_dataframe(df=df)
+        # Categorical columns only speed up processing, write their values back with the original dtype
+        categorical = df.select_dtypes('category').columns
+        if len(categorical):
+            df = df.astype({col: df[col].cat.categories.dtype for col in categorical})
+
+        database_inst._validate_headers(df.columns.tolist(), database_inst.DEFAULT_SCHEMA)
+
+        if ARROW_AVAILABLE:
+            rows_written = self._ingest_arrow(df=df, database_inst=database_inst)
+        else:
+            rows_written = self._ingest_rows(df=df, database_inst=database_inst)
+
+        log.info("%s rows written to %s.", rows_written, database_inst.db_name)
+
+    def batch_ingest(self, dfs: List[pd.DataFrame], database: Type[SqliteDatabase]) -> pd.DataFrame:
+        """
+        Insert several DataFrames for the same table in a single transaction.
+
+        Args:
+            dfs (List[pd.DataFrame]): The frames to insert, e.g. one per ticker. Empty frames are skipped.
+            database (Type[SqliteDatabase]): The table class the data belongs to.
+
+        Returns:
+            pd.DataFrame: The combined data.
+        """
+        dfs = [df for df in dfs if not df.empty]
+        if not dfs:
+            log.info("No rows to write to %s.", database.DEFAULT_PATH)
+            return pd.DataFrame()
+
+        df = pd.concat(dfs, ignore_index=True)
+
+        try:
+            self.ingest_dataframe(df=df, database=database)
+        except Exception as e:
+            log.error(f"Failed to ingest data into {database.DEFAULT_PATH}: {str(e)}")
+
+        return df
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    from orjson import dumps as json_dumps
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+    def json_dumps(obj: Any) -> bytes:
+        """
+        Serialise an object to UTF-8 encoded JSON, matching the output type of `orjson.dumps`.
+
+        Args:
+            obj (Any): The object to serialise.
+
+        Returns:
+            bytes: The encoded JSON.
+        """
+        return json.dumps(obj).encode()
+
+log = logging.getLogger(__name__)
+
+
+class FileCache:
+    """
+    Persistent on-disk cache for Alpha Vantage API responses.
+
+    Responses are stored as JSON under `<cache_dir>/<ticker>/<function>/<hash>.json`, where the hash is taken
+    over the request parameters excluding the API key, so the same request made with different keys shares an
+    entry. News sentiment windows that closed more than `SETTLED_AFTER` ago never change and are kept
+    indefinitely; every other response expires after `TTL` seconds. Error, rate limit and other notice
+    responses are never cached.
+
+    Attributes:
+        TTL (float): Lifetime, in seconds, of responses that may still change.
+        SETTLED_AFTER (timedelta): Age after which a news sentiment window is treated as final.
+        ERROR_KEYS (Tuple[str, ...]): Top-level keys that mark a response as an error or notice rather than data.
+        cache_dir (str): The root directory of the cache.
+        hits (int): Number of requests served from the cache.
+        misses (int): Number of requests that had to be fetched.
+    """
+
+    TTL: float = 24 * 60 * 60
+    SETTLED_AFTER: timedelta = timedelta(days=30)
+    ERROR_KEYS: Tuple[str, ...] = ('Error Message', 'Note', 'Information')
+
+    def __init__(self, cache_dir: str) -> None:
+        """
+        Initialise the cache rooted at the given directory.
+
+        Args:
+            cache_dir (str): The root directory of the cache.
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Return the hit and miss counts for this cache.
+
+        Returns:
+            Dict[str, int]: The number of cache hits and misses.
+        """
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def _path(self, params: Dict[str, str]) -> str:
+        """
+        Return the file path of the cache entry for a set of request parameters.
+
+        Args:
+            params (Dict[str, str]): The request parameters, excluding the API key.
+
+        Returns:
+            str: The path of the cache entry.
+        """
+        key = hashlib.md5(urllib.parse.urlencode(sorted(params.items())).encode()).hexdigest()
+        ticker = params.get('symbol') or params.get('ticker') or 'GLOBAL'
+        return os.path.join(self.cache_dir, ticker.upper(), params.get('function', 'UNKNOWN'), f"{key}.json")
+
+    def _ttl(self, params: Dict[str, str]) -> Optional[float]:
+        """
+        Return how long a response may be cached for, or None if it never expires.
+
+        Args:
+            params (Dict[str, str]): The request parameters.
+
+        Returns:
+            Optional[float]: The lifetime of the entry in seconds, or None for no expiry.
+        """
+        time_to = params.get('time_to')
+        if params.get('function') == 'NEWS_SENTIMENT' and time_to:
+            try:
+                window_end = datetime.strptime(time_to, '%Y%m%dT%H%M')
+            except ValueError:
+                # Only the documented minute precision format is recognised, treat anything else as live data
+                return self.TTL
+            if window_end < datetime.now() - self.SETTLED_AFTER:
+                return None
+        return self.TTL
+
+    def _cacheable(self, data: Dict) -> bool:
+        """
+        Return whether a response holds data rather than an error or notice from the API.
+
+        Args:
+            data (Dict): The parsed response.
+
+        Returns:
+            bool: True if the response may be cached.
+        """
+        return isinstance(data, dict) and not any(key in data for key in self.ERROR_KEYS)
+
+    def get_or_set(self, url: str, fetch: Callable[[], Dict]) -> Dict:
+        """
+        Return the cached response for a URL, calling `fetch` and caching its result on a miss.
+
+        Responses containing any of `ERROR_KEYS` are returned but not cached, so a transient error is not
+        replayed on later runs.
+
+        Args:
+            url (str): The request URL.
+            fetch (Callable[[], Dict]): Makes the request and returns the parsed response.
+
+        Returns:
+            Dict: The parsed response.
+        """
+        params = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query))
+        params.pop('apikey', None)
+        path = self._path(params)
+        ttl = self._ttl(params)
+
+        try:
+            if ttl is None or time.time() - os.path.getmtime(path) < ttl:
+                with open(path, 'rb') as file:
+                    data = json_loads(file.read())
+                # Entries written before error responses were filtered out are refetched
+                if self._cacheable(data):
+                    with self._lock:
+                        self.hits += 1
+                    log.debug("Cache hit for %s (%s).", path, self.cache_stats)
+                    return data
+        except (OSError, ValueError):
+            pass
+
+        data = fetch()
+        with self._lock:
+            self.misses += 1
+        log.debug("Cache miss for %s (%s).", path, self.cache_stats)
+
+        if not self._cacheable(data):
+            log.debug("Not caching error response for %s.", path)
+            return data
+
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(json_dumps(data))
+        os.replace(tmp_path, path)
+
+        return data
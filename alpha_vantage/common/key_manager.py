@@ -1,18 +1,55 @@
+import functools
+import heapq
 import json
 import logging
+import os
 import random
+import threading
 import time
+import urllib.parse
+import uuid
 from abc import ABC
-from typing import Dict, Optional, Tuple
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set, Tuple
 
 import requests
 from orb.common.vpn.pia import PiaVpn, VPNConnectionError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from alpha_vantage import REPO_PATH
+from alpha_vantage.common.rate_limit import TokenBucket
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 log = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1)
+def load_key_config(state_file: str, mtime_ns: int) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Parse the API key state file into immutable tuples of active and expired keys.
+
+    The result is cached on the file path and its modification time, so the file is only re-parsed
+    once it has changed on disk. Call `load_key_config.cache_clear()` to force a re-read.
+
+    Args:
+        state_file (str): The path to the JSON state file.
+        mtime_ns (int): The modification time of the file, as returned by `os.stat(...).st_mtime_ns`.
+
+    Returns:
+        Tuple[Tuple[str, ...], Tuple[str, ...]]: The active and expired API keys.
+    """
+    log.debug("Loading API keys from configuration file.")
+    with open(state_file, 'r') as file:
+        config = json.load(file)
+    return tuple(config.get('active_keys', [])), tuple(config.get('expired_keys', []))
+
+
 class APIKeyManager(ABC):
     """
     Singleton class for managing API keys and handling API requests with rate limiting.
@@ -24,15 +61,33 @@ class APIKeyManager(ABC):
         _instance (APIKeyManager): The singleton instance of the class.
         API_LIMIT (int): Maximum allowed requests per API key.
         STATE_FILE (str): The path to the JSON file where the state of active and expired API keys is saved.
+        REQUEST_TIMEOUT (Tuple[float, float]): Connect and read timeouts, in seconds, for API requests.
+        MAX_ATTEMPTS (int): Maximum number of attempts for a single request while the API reports rate limiting.
+        MAX_IN_FLIGHT (int): Maximum number of concurrent requests admitted per API key.
+        REQUESTS_PER_MINUTE (int): Request rate allowed by the Alpha Vantage plan, 5 on the free tier and 75 or
+            more on premium tiers. Both request limiters are derived from it.
         active_keys (Dict[str, int]): Dictionary of active API keys with their remaining usage counts.
         expired_keys (Dict[str, int]): Dictionary of expired API keys.
         api_key (str): The currently active API key.
-        pia (PiaVpn): Instance of the PiaVpn class to manage VPN connections.
+        pia (PiaVpn): Instance of the PiaVpn class to manage VPN connections, created on first use.
+        _key_heap (List[Tuple[int, float, str]]): Max-heap of (-available, tiebreak, key) entries used to pick
+            the key with the most requests left. Stale entries are discarded lazily when they reach the top.
+        _in_flight (Dict[str, Set[str]]): IDs of the requests currently in flight for each API key.
+        _key_semaphores (Dict[str, threading.BoundedSemaphore]): Per-key semaphores capping in-flight requests.
+        _next_ok (Dict[str, float]): Earliest `time.monotonic()` at which each API key may start its next request.
+        _lock (threading.RLock): Guards key state shared between request threads.
+        _session (requests.Session): Pooled HTTP session shared by all request threads.
+        _bucket (TokenBucket): Limits the combined request rate of all request threads to `REQUESTS_PER_MINUTE`,
+            allowing a minute's worth of requests in a burst.
     """
 
     _instance = None  # Class-level attribute to hold the singleton instance
     API_LIMIT: int = 25
     STATE_FILE: str = f"{REPO_PATH}/api_keys.json"
+    REQUEST_TIMEOUT: Tuple[float, float] = (3.05, 30)
+    MAX_ATTEMPTS: int = 6
+    MAX_IN_FLIGHT: int = 1
+    REQUESTS_PER_MINUTE: int = 5
 
     def __new__(cls, *args, **kwargs):
         """
@@ -60,19 +115,71 @@ class APIKeyManager(ABC):
             return
 
         self.STATE_FILE = api_config_path
+        self._lock = threading.RLock()
+        self._session = self._create_session()
+        self._in_flight: Dict[str, Set[str]] = defaultdict(set)
+        self._key_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_ok: Dict[str, float] = {}
+        # The plan limit is also enforced per client IP, so the bucket holds all keys together to it and is
+        # the limiter that binds. Spacing each key's requests only stops one key from using up the burst alone.
+        self._bucket = TokenBucket(rate=self.REQUESTS_PER_MINUTE / 60, capacity=self.REQUESTS_PER_MINUTE)
 
         self.active_keys, self.expired_keys = self.load_api_keys(api_limit=self.API_LIMIT)
+        self._rebuild_key_heap()
         self.ensure_active_keys()
 
         if api_key and api_key in self.active_keys:
             self.api_key = api_key
-            log.info(f"Starting with provided API key: {self.api_key}")
+            log.info("Starting with provided API key: %s", self.api_key)
         else:
             self.set_key()
 
-        self.pia = PiaVpn()
         self._initialized = True
 
+    @functools.cached_property
+    def pia(self) -> PiaVpn:
+        """
+        Return the PIA VPN client, creating it the first time an IP address change is needed.
+
+        Returns:
+            PiaVpn: The VPN client.
+        """
+        return PiaVpn()
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """
+        Create the HTTP session used for all API requests.
+
+        The session keeps connections to the API host alive between requests and retries transient
+        server errors with a short backoff. Its connection pool is shared by all request threads.
+
+        Returns:
+            requests.Session: The pooled session.
+        """
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries))
+        return session
+
+    def close(self):
+        """
+        Close the pooled HTTP connections.
+        """
+        self._session.close()
+
+    def __enter__(self) -> 'APIKeyManager':
+        """
+        Use the manager as a context manager, closing it on exit.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """
+        Close the manager when leaving the context.
+        """
+        self.close()
+
     def load_api_keys(self, api_limit: int) -> Tuple[Dict[str, int], Dict[str, int]]:
         """
         Load API keys from a JSON configuration file and return dictionaries of active and
@@ -84,13 +191,11 @@ class APIKeyManager(ABC):
         Returns:
             Tuple[Dict[str, int], Dict[str, int]]: Dictionaries of active and expired API keys with their usage counts.
         """
-        log.debug("Loading API keys from configuration file.")
-        with open(self.STATE_FILE, 'r') as file:
-            config = json.load(file)
-        active_keys = {api_key: api_limit for api_key in config.get('active_keys', [])}
-        expired_keys = {api_key: api_limit for api_key in config.get('expired_keys', [])}
+        active, expired = load_key_config(self.STATE_FILE, os.stat(self.STATE_FILE).st_mtime_ns)
+        active_keys = {api_key: api_limit for api_key in active}
+        expired_keys = {api_key: api_limit for api_key in expired}
 
-        log.info(f"Loaded {len(active_keys)} active API keys and {len(expired_keys)} expired API keys.")
+        log.info("Loaded %s active API keys and %s expired API keys.", len(active_keys), len(expired_keys))
         return active_keys, expired_keys
 
     def ensure_active_keys(self):
@@ -98,64 +203,126 @@ class APIKeyManager(ABC):
         Ensure that there are active API keys available. If not, swap expired keys with active keys in both
         memory and the JSON file.
         """
-        if len(self.active_keys) == 0:
-            log.warning("No active API keys available. Swapping expired keys with active keys.")
-            self.active_keys, self.expired_keys = self.expired_keys, self.active_keys
-            self.save_api_keys()
-            log.info(
-                f"Swapped keys. Now {len(self.active_keys)} active keys and {len(self.expired_keys)} expired keys.")
+        with self._lock:
+            if len(self.active_keys) == 0:
+                log.warning("No active API keys available. Swapping expired keys with active keys.")
+                self.active_keys, self.expired_keys = self.expired_keys, self.active_keys
+                self._rebuild_key_heap()
+                self.save_api_keys()
+                log.info(
+                    "Swapped keys. Now %s active keys and %s expired keys.",
+                    len(self.active_keys), len(self.expired_keys)
+                )
 
     def save_api_keys(self):
         """
-        Save the current state of active and expired API keys to a JSON file.
+        Write the current state of active and expired API keys to the JSON file.
+
+        The file is written to a temporary path and then moved into place, so readers never see a partial write.
         """
-        with open(self.STATE_FILE, 'w') as file:
-            json.dump(
-                {'active_keys': list(self.active_keys.keys()), 'expired_keys': list(self.expired_keys.keys())}, file)
+        with self._lock:
+            config = {'active_keys': list(self.active_keys.keys()), 'expired_keys': list(self.expired_keys.keys())}
+            tmp_file = f"{self.STATE_FILE}.tmp"
+            with open(tmp_file, 'w') as file:
+                json.dump(config, file)
+            os.replace(tmp_file, self.STATE_FILE)
         log.info("Saved current state of API keys.")
 
+    def _available_requests(self, api_key: str) -> Optional[int]:
+        """
+        Return the requests left for an API key once its in-flight requests are accounted for.
+
+        Args:
+            api_key (str): The key to check.
+
+        Returns:
+            Optional[int]: The remaining requests less those in flight, or None if the key is not active.
+        """
+        if api_key not in self.active_keys:
+            return None
+        return self.active_keys[api_key] - len(self._in_flight[api_key])
+
+    def _push_key(self, api_key: str):
+        """
+        Push the current available request count of an API key onto the key heap.
+
+        A random tiebreak is stored with each entry so keys with equal remaining requests are chosen at random.
+
+        Args:
+            api_key (str): The key to push.
+        """
+        heapq.heappush(self._key_heap, (-self._available_requests(api_key), random.random(), api_key))
+
+    def _rebuild_key_heap(self):
+        """
+        Rebuild the key heap from the active keys.
+        """
+        with self._lock:
+            self._key_heap = []
+            for api_key in self.active_keys:
+                self._push_key(api_key)
+
     def set_key(self):
         """
         Set the API key to the one with the maximum available requests. If no keys are available, raises an exception.
         """
-        self.ensure_active_keys()
-        if not self.active_keys:
-            log.error("No available requests for any API key.")
-            raise RuntimeError("No requests available for any API key")
+        with self._lock:
+            self.ensure_active_keys()
+            if not self.active_keys:
+                log.error("No available requests for any API key.")
+                raise RuntimeError("No requests available for any API key")
 
-        max_value = max(self.active_keys.values())
-        max_keys = [key for key, value in self.active_keys.items() if value == max_value]
+            # Discard entries for retired keys or outdated counts
+            while -self._key_heap[0][0] != self._available_requests(self._key_heap[0][2]):
+                heapq.heappop(self._key_heap)
 
-        self.api_key = random.choice(max_keys)
-        log.info(f"API key set to: {self.api_key} with {max_value} requests remaining.")
+            max_value, _, self.api_key = self._key_heap[0]
+        log.info("API key set to: %s with %s requests remaining.", self.api_key, -max_value)
 
-    def remove_key(self):
-        """
-        Remove the current API key from the active keys, move it to expired keys, and log the action.
+    def remove_key(self, api_key: Optional[str] = None):
         """
-        log.info(f"Removing API key: {self.api_key} due to exhaustion of requests.")
-        self.expired_keys[self.api_key] = self.API_LIMIT  # Move the key to expired_keys
-        del self.active_keys[self.api_key]
-        self.save_api_keys()
+        Remove an API key from the active keys, move it to expired keys, and log the action.
 
-    def update_key_usage(self):
+        Args:
+            api_key (Optional[str]): The key to remove. Defaults to the current API key.
         """
-        Update the usage count for the current API key and handle key rotation if needed.
+        api_key = api_key or self.api_key
+        log.info("Removing API key: %s due to exhaustion of requests.", api_key)
+        with self._lock:
+            if api_key not in self.active_keys:
+                return
+            self.expired_keys[api_key] = self.API_LIMIT  # Move the key to expired_keys
+            del self.active_keys[api_key]
+            self.save_api_keys()
+
+    def update_key_usage(self, api_key: Optional[str] = None):
         """
-        current_count = self.active_keys[self.api_key]
-        new_count = current_count - 1
+        Update the usage count for an API key and handle key rotation if needed.
 
-        if new_count == 0:
-            self.remove_key()
-            if self.active_keys:
-                self.set_key()
+        Args:
+            api_key (Optional[str]): The key that made the request. Defaults to the current API key.
+        """
+        api_key = api_key or self.api_key
+        with self._lock:
+            if api_key not in self.active_keys:
+                # Already retired by another thread
+                return
+
+            current_count = self.active_keys[api_key]
+            new_count = current_count - 1
+
+            if new_count == 0:
+                self.remove_key(api_key)
+                if self.active_keys:
+                    if api_key == self.api_key:
+                        self.set_key()
+                else:
+                    log.error("All API keys exhausted.")
+                    raise RuntimeError("All API keys exhausted")
             else:
-                log.error("All API keys exhausted.")
-                raise RuntimeError("All API keys exhausted")
-        else:
-            self.active_keys[self.api_key] = new_count
-            log.info(f"Requests remaining for API key {self.api_key}: {new_count}")
-            self.save_api_keys()
+                self.active_keys[api_key] = new_count
+                self._push_key(api_key)
+                log.info("Requests remaining for API key %s: %s", api_key, new_count)
 
     def change_ip_address(self) -> None:
         """
@@ -176,19 +343,92 @@ class APIKeyManager(ABC):
             log.error(f"Failed to change IP address using PIA VPN: {e}")
             raise VPNConnectionError(f"Failed to change IP address using PIA VPN: {e}")
 
-    def make_request(self, url: str) -> Dict:
+    def _wait_for_slot(self, api_key: str):
+        """
+        Block until the API key may start another request, then reserve the following slot.
+
+        Requests on the same key start at least `60 / REQUESTS_PER_MINUTE` seconds apart. Each key is scheduled
+        independently, so requests on different keys never wait on one another here.
+
+        Args:
+            api_key (str): The key the request is made with.
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_ok.get(api_key, now))
+            self._next_ok[api_key] = start + 60 / self.REQUESTS_PER_MINUTE
+
+        if start > now:
+            log.debug("Waiting %.2fs before the next request with key %s.", start - now, api_key)
+            time.sleep(start - now)
+
+    @contextmanager
+    def _track_in_flight(self, api_key: str) -> Iterator[str]:
+        """
+        Admit a request for an API key, blocking while the key already has `MAX_IN_FLIGHT` requests in flight.
+
+        The request is registered against the key for the duration of the block, so key selection does not
+        hand out quota that concurrent requests are about to use.
+
+        Args:
+            api_key (str): The key the request is made with.
+
+        Yields:
+            str: The ID of the admitted request.
+        """
+        with self._lock:
+            semaphore = self._key_semaphores.setdefault(api_key, threading.BoundedSemaphore(self.MAX_IN_FLIGHT))
+
+        semaphore.acquire()
+        request_id = uuid.uuid4().hex
+        with self._lock:
+            self._in_flight[api_key].add(request_id)
+            if api_key in self.active_keys:
+                self._push_key(api_key)
+        try:
+            yield request_id
+        finally:
+            with self._lock:
+                self._in_flight[api_key].discard(request_id)
+                if api_key in self.active_keys:
+                    self._push_key(api_key)
+            semaphore.release()
+
+    @staticmethod
+    def _replace_api_key(url: str, api_key: str) -> str:
+        """
+        Return the URL with its `apikey` query parameter replaced.
+
+        Args:
+            url (str): The request URL.
+            api_key (str): The API key to substitute.
+
+        Returns:
+            str: The URL using the given API key.
+        """
+        parts = urllib.parse.urlsplit(url)
+        params = dict(urllib.parse.parse_qsl(parts.query))
+        params['apikey'] = api_key
+        return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(params)))
+
+    def make_request(self, url: str, api_key: Optional[str] = None) -> Dict:
         """
         Make an API request using the current API key. Decrease the count of available requests for the API key.
         Automatically resets or removes the key if no requests remain. Handles rate limits and API response errors.
 
+        When the API reports rate limiting the request is retried with exponential backoff. A key that is
+        throttled twice is retired, the request moves to a new key, and the IP address is changed.
+
         Args:
             url (str): The URL to which the API request is made.
+            api_key (Optional[str]): The key the URL was built with. Defaults to the current API key.
 
         Returns:
             dict: Parsed JSON data from the API response.
 
         Raises:
-            RuntimeError: If no API keys are available or if the API response is an error.
+            RuntimeError: If no API keys are available, if the API response is an error, or if the request
+                is still rate limited after `MAX_ATTEMPTS` attempts.
         """
         self.ensure_active_keys()
 
@@ -196,32 +436,51 @@ class APIKeyManager(ABC):
             log.error("Attempted to make a request with no available API keys.")
             raise RuntimeError("No API keys available")
 
-        try:
-            log.info(f"Making API request to {url} using key {self.api_key}.")
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-
-            log.info(f"Successful API call to {url} with key {self.api_key}.")
-            log.info(f"Requests remaining for API key {self.api_key}: {self.active_keys[self.api_key]}")
-
-            if 'Information' in data:
-                log.warning(f"API limit or other information received: {data['Information']}")
-                self.remove_key()
-                self.set_key()
+        api_key = api_key or self.api_key
+        throttled_keys: Dict[str, int] = {}
+
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            try:
+                log.info(
+                    "Making API request to %s using key %s (attempt %s/%s).", url, api_key, attempt, self.MAX_ATTEMPTS)
+                self._wait_for_slot(api_key)
+                self._bucket.acquire()
+                with self._track_in_flight(api_key):
+                    response = self._session.get(url, timeout=self.REQUEST_TIMEOUT)
+                response.raise_for_status()
+                data = json_loads(response.content)
+
+            except requests.HTTPError as e:
+                log.error(f"HTTP error occurred during API request: {e}")
+                raise
+            except ValueError as e:
+                log.error(f"Invalid JSON response received from API: {e}")
+                raise RuntimeError("Invalid JSON response") from e
+            except Exception as e:
+                log.error(f"Unexpected error occurred: {e}")
+                raise
+
+            if 'Information' not in data:
+                log.info("Successful API call to %s with key %s.", url, api_key)
+                self.update_key_usage(api_key)
+                return data
+
+            throttled_keys[api_key] = throttled_keys.get(api_key, 0) + 1
+            log.warning(
+                f"API limit or other information received on attempt {attempt} with key {api_key} "
+                f"(throttled {throttled_keys[api_key]} times): {data['Information']}"
+            )
+
+            if throttled_keys[api_key] >= 2:
+                # The key is exhausted rather than briefly rate limited, so move to another key and IP
+                with self._lock:
+                    self.remove_key(api_key)
+                    self.set_key()
+                    api_key = self.api_key
+                url = self._replace_api_key(url=url, api_key=api_key)
                 self.change_ip_address()
-                time.sleep(8)
-                return self.make_request(url=url)
-
-            self.update_key_usage()
-            return data
-
-        except requests.HTTPError as e:
-            log.error(f"HTTP error occurred during API request: {e}")
-            raise
-        except ValueError as e:
-            log.error(f"Invalid JSON response received from API: {e}")
-            raise RuntimeError("Invalid JSON response") from e
-        except Exception as e:
-            log.error(f"Unexpected error occurred: {e}")
-            raise
+            elif attempt < self.MAX_ATTEMPTS:
+                time.sleep(min(2 ** attempt, 30))
+
+        log.error(f"Request to {url} still rate limited after {self.MAX_ATTEMPTS} attempts.")
+        raise RuntimeError(f"API rate limit persisted after {self.MAX_ATTEMPTS} attempts")
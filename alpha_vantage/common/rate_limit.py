@@ -0,0 +1,66 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so callers can burst up to `capacity`
+    requests and are then held to the sustained rate. Blocked callers sleep only until enough tokens have
+    accumulated.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum number of tokens the bucket holds.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        Initialise a full bucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum number of tokens the bucket holds.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _reserve(self, tokens: float) -> float:
+        """
+        Take tokens from the bucket if enough are available. Must be called with the condition held.
+
+        Args:
+            tokens (float): The number of tokens to take.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the number of seconds until they will be available.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0
+        return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1):
+        """
+        Block the calling thread until the tokens are available, then take them.
+
+        Args:
+            tokens (float): The number of tokens to take.
+
+        Raises:
+            ValueError: If more tokens are requested than the bucket can hold.
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket with capacity {self.capacity}.")
+
+        with self._condition:
+            while (wait := self._reserve(tokens)) > 0:
+                self._condition.wait(wait)
@@ -1,5 +1,5 @@
+import functools
 import logging
-import time
 
 import pandas as pd
 
@@ -34,26 +34,23 @@ class EconomicIndicatorsFetcher(AlphaVantageAPI):
         dfs = []
         indicators = ['CPI', 'INFLATION', 'RETAIL_SALES', 'DURABLES', 'UNEMPLOYMENT', 'NONFARM_PAYROLL']
 
-        log.info(f"This method will use up {len(indicators)} API calls.")
-        for func in indicators:
-            kwargs = {
-                "function": func,
-            }
-            url = self.build_url_request(**kwargs)
-            data = self.make_request(url=url)
+        log.info("This method will use up %s API calls.", len(indicators))
+        responses = self.make_requests([{"function": func} for func in indicators])
 
+        for func, data in zip(indicators, responses):
             df = pd.DataFrame(data['data'])
             df.columns = ['DATE', func.upper()]
-            df['DATE'] = pd.to_datetime(df['DATE'])
 
-            dfs.append(df)
+            # Index on the raw ISO date strings and store values as float32
+            df = df.set_index('DATE')
+            df = df.apply(pd.to_numeric, errors='coerce').astype('float32')
 
-            time.sleep(5)  # Wait to avoid hitting API rate limits
+            dfs.append(df)
 
-        # Merge all DataFrames on the 'DATE' column
-        full_df = pd.concat(
-            [dfs[0]] + [df.drop(columns=['DATE']) for df in dfs[1:]], axis=1, join='inner')
+        # Join all DataFrames on their 'DATE' index
+        full_df = functools.reduce(lambda left, right: left.join(right, how='inner'), dfs).reset_index()
 
-        full_df['DATE'] = full_df['DATE'].dt.date
+        # Parse the dates once, after the join, with a fixed format
+        full_df['DATE'] = pd.to_datetime(full_df['DATE'], format='%Y-%m-%d', cache=True).dt.date
 
         return full_df
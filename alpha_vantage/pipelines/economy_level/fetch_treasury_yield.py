@@ -1,5 +1,5 @@
+import functools
 import logging
-import time
 
 import pandas as pd
 
@@ -32,27 +32,33 @@ class TreasuryYieldFetcher(AlphaVantageAPI):
         """
         dfs = []
         MATURITY_INTERVALS = ['3month', '2year', '5year', '7year', '10year', '30year']
-        log.info(f"This method will use up {len(MATURITY_INTERVALS)} API calls.")
-        for maturity in MATURITY_INTERVALS:
-            # Create query parameters for the API request
-            kwargs = {
+        log.info("This method will use up %s API calls.", len(MATURITY_INTERVALS))
+
+        # Create query parameters for each API request
+        requests_kwargs = [
+            {
                 "function": 'TREASURY_YIELD',
                 "interval": 'daily',
                 "maturity": maturity,
             }
-            url = self.build_url_request(**kwargs)
-            data = self.make_request(url=url)
+            for maturity in MATURITY_INTERVALS
+        ]
+        responses = self.make_requests(requests_kwargs)
 
+        for maturity, data in zip(MATURITY_INTERVALS, responses):
             df = pd.DataFrame(data['data'])
             df.columns = ['Date', f'TREASURY_YIELD_{maturity.upper()}']
-            df['Date'] = pd.to_datetime(df['Date'])
+
+            # Index on the raw ISO date strings and store values as float32
+            df = df.set_index('Date')
+            df = df.apply(pd.to_numeric, errors='coerce').astype('float32')
 
             dfs.append(df)
 
-            time.sleep(5)  # Wait to avoid hitting API rate limits
+        # Join all DataFrames on their 'Date' index
+        full_df = functools.reduce(lambda left, right: left.join(right, how='inner'), dfs).reset_index()
 
-        # Merge all DataFrames on the 'Date' column
-        full_df = pd.concat(
-            [dfs[0]] + [df.drop(columns=['Date']) for df in dfs[1:]], axis=1, join='inner')
+        # Parse the dates once, after the join, with a fixed format
+        full_df['Date'] = pd.to_datetime(full_df['Date'], format='%Y-%m-%d', cache=True)
 
         return full_df
@@ -1,5 +1,7 @@
+import functools
 import logging
 import re
+from typing import Dict, Optional, Tuple
 
 import pandas as pd
 
@@ -8,6 +10,76 @@ from alpha_vantage.tables import FinancialData
 
 log = logging.getLogger(__name__)
 
+CAMEL_CASE_PATTERN = re.compile(r'(?<!^)(?=[A-Z])')
+
+
+@functools.lru_cache(maxsize=512)
+def to_upper_snake_case(col: str) -> str:
+    """
+    Convert a camelCase column name to upper snake case, e.g. 'fiscalDateEnding' to 'FISCAL_DATE_ENDING'.
+
+    Args:
+        col (str): The camelCase column name.
+
+    Returns:
+        str: The upper snake case column name.
+    """
+    return CAMEL_CASE_PATTERN.sub('_', col).upper()
+
+
+@functools.lru_cache(maxsize=512)
+def column_dtype(col: str) -> Optional[str]:
+    """
+    Return the pandas dtype for a financial column, derived from its type in the FinancialData schema.
+
+    Whole-number amounts are held as float64 so missing values can be represented. The DECIMAL ratios
+    and per-share figures are float64 too, since float32 values are widened when written to sqlite and
+    would be stored with rounding noise (e.g. 1.2300000190734863). Columns that appear in more than one
+    statement are looked up under their merge-suffixed name.
+
+    Args:
+        col (str): The upper snake case column name.
+
+    Returns:
+        Optional[str]: The dtype to cast the column to, or None to leave it as returned by the API.
+    """
+    schema = FinancialData.DEFAULT_SCHEMA
+    sql_type = schema.get(col, schema.get(f'{col}_x', ''))
+    if sql_type.startswith(('BIGINT', 'DECIMAL')):
+        return 'float64'
+    return None
+
+
+@functools.lru_cache(maxsize=32)
+def column_dtypes(columns: Tuple[str, ...]) -> Dict[str, str]:
+    """
+    Return the dtype map for a full set of financial columns, memoised per endpoint schema.
+
+    Args:
+        columns (Tuple[str, ...]): The upper snake case column names.
+
+    Returns:
+        Dict[str, str]: Mapping of numeric column names to their dtype.
+    """
+    return {col: dtype for col in columns if (dtype := column_dtype(col))}
+
+
+@functools.lru_cache(maxsize=32)
+def rename_columns(columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Convert a full set of API column names to upper snake case.
+
+    Alpha Vantage returns the same schema for every ticker on a given endpoint, so the whole column
+    list is memoised.
+
+    Args:
+        columns (Tuple[str, ...]): The camelCase column names.
+
+    Returns:
+        Tuple[str, ...]: The upper snake case column names.
+    """
+    return tuple(to_upper_snake_case(col) for col in columns)
+
 
 class FinancialDataFetcher(AlphaVantageAPI):
     """
@@ -35,9 +107,11 @@ class FinancialDataFetcher(AlphaVantageAPI):
             pd.DataFrame: A DataFrame containing the balance sheet data, with currency columns removed.
         """
         return self._build_dataframe(
-            ticker, 'BALANCE_SHEET', 'quarterlyReports').drop(columns='REPORTED_CURRENCY')
+            ticker, 'BALANCE_SHEET', 'quarterlyReports', drop_cols=('reportedCurrency',))
 
-    def _build_dataframe(self, ticker: str, function: str, data_key: str) -> pd.DataFrame:
+    def _build_dataframe(
+        self, ticker: str, function: str, data_key: str, drop_cols: Tuple[str, ...] = ()
+    ) -> pd.DataFrame:
         """
         Retrieve data from the API and build a DataFrame for a specific financial function.
 
@@ -45,6 +119,7 @@ class FinancialDataFetcher(AlphaVantageAPI):
             ticker (str): The stock ticker symbol.
             function (str): The financial function to retrieve (e.g., 'BALANCE_SHEET', 'INCOME_STATEMENT').
             data_key (str): The key to access the relevant data in the API response.
+            drop_cols (Tuple[str, ...]): Raw API field names to leave out of the DataFrame.
 
         Returns:
             pd.DataFrame: A DataFrame constructed from the API response for the specified financial function.
@@ -54,10 +129,18 @@ class FinancialDataFetcher(AlphaVantageAPI):
 
         data = self.make_request(url=url)
 
-        df = pd.DataFrame(data[data_key])
+        records = data[data_key]
+        if drop_cols:
+            records = [{k: v for k, v in row.items() if k not in drop_cols} for row in records]
+
+        df = pd.DataFrame.from_records(records)
 
         # Convert camelCase to snake_case and uppercase all column names
-        df.columns = [re.sub(r'(?<!^)(?=[A-Z])', '_', col).upper() for col in df.columns]
+        df.columns = rename_columns(tuple(df.columns))
+
+        # Cast the numeric string fields, the API's 'None' becomes missing
+        for col, dtype in column_dtypes(tuple(df.columns)).items():
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
 
         return df
 
@@ -72,7 +155,7 @@ class FinancialDataFetcher(AlphaVantageAPI):
             pd.DataFrame: A DataFrame containing the income statement data, with currency columns removed.
         """
         return self._build_dataframe(
-            ticker, 'INCOME_STATEMENT', 'quarterlyReports').drop(columns='REPORTED_CURRENCY')
+            ticker, 'INCOME_STATEMENT', 'quarterlyReports', drop_cols=('reportedCurrency',))
 
     def _build_cash_flow(self, ticker: str) -> pd.DataFrame:
         """
@@ -85,7 +168,7 @@ class FinancialDataFetcher(AlphaVantageAPI):
             pd.DataFrame: A DataFrame containing the cash flow data, with currency columns removed.
         """
         return self._build_dataframe(
-            ticker, 'CASH_FLOW', 'quarterlyReports').drop(columns='REPORTED_CURRENCY')
+            ticker, 'CASH_FLOW', 'quarterlyReports', drop_cols=('reportedCurrency',))
 
     def _build_earnings(self, ticker: str) -> pd.DataFrame:
         """
@@ -100,14 +183,18 @@ class FinancialDataFetcher(AlphaVantageAPI):
         return self._build_dataframe(
             ticker, 'EARNINGS', 'quarterlyEarnings')
 
-    def get_financial_data(self, ticker: str) -> pd.DataFrame:
+    def get_financial_data(self, ticker: str, defer_ingest: bool = False) -> pd.DataFrame:
         """
         Build a consolidated DataFrame containing quarterly fundamental data for a stock.
 
-        This method combines balance sheet, income statement, cash flow, and earnings data into a single DataFrame.
+        This method combines balance sheet, income statement, cash flow, and earnings data into a single DataFrame,
+        with one row per fiscal date. Where a statement reports the same fiscal date more than once, the maximum
+        of each column is kept.
 
         Args:
             ticker (str): The stock ticker symbol.
+            defer_ingest (bool): If True, return the data without writing it to the database, leaving the caller
+                to ingest it, e.g. in a batch with other tickers.
 
         Returns:
             pd.DataFrame: A DataFrame containing consolidated quarterly fundamental data for the given ticker.
@@ -117,22 +204,25 @@ class FinancialDataFetcher(AlphaVantageAPI):
         cash_flow = self._build_cash_flow(ticker)
         earnings = self._build_earnings(ticker)
 
-        # Merge all financial data on the fiscal date
-        df = balance_sheet.merge(income_statement, on='FISCAL_DATE_ENDING', how='inner')
-        df = df.merge(cash_flow, on='FISCAL_DATE_ENDING', how='inner')
-        df = df.merge(earnings, on='FISCAL_DATE_ENDING', how='inner')
+        # NET_INCOME is reported in both statements, keep the suffixes the table schema expects
+        income_statement = income_statement.rename(columns={'NET_INCOME': 'NET_INCOME_x'})
+        cash_flow = cash_flow.rename(columns={'NET_INCOME': 'NET_INCOME_y'})
+
+        # Align all financial data on the fiscal date in a single concat. A statement that reports a date more
+        # than once is reduced to one row per date, taking the maximum of each column.
+        frames = []
+        for frame in (balance_sheet, income_statement, cash_flow, earnings):
+            frame = frame.set_index('FISCAL_DATE_ENDING')
+            if frame.index.has_duplicates:
+                frame = frame.groupby(level=0, sort=False).max()
+            frames.append(frame)
+        df = pd.concat(frames, axis=1, join='inner').reset_index()
 
         # Insert the ticker symbol as a column
         df.insert(loc=1, column='TICKER', value=ticker.upper())
 
-        # Group by relevant columns and aggregate by taking the maximum value
-        group_by_cols = ['FISCAL_DATE_ENDING', 'TICKER', 'REPORTED_DATE', 'REPORT_TIME']
-        df = df.groupby(group_by_cols).agg(
-            {col: 'max' for col in df.columns if col not in group_by_cols}
-        ).reset_index()
-
-        # Drop duplicate rows
-        df = df.drop_duplicates()
+        if defer_ingest:
+            return df
 
         try:
             self.ingest_dataframe(df=df, database=FinancialData)
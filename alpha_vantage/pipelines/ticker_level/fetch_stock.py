@@ -21,12 +21,14 @@ class StockPriceFetcher(AlphaVantageAPI):
             Fetches and processes historical stock data for a given ticker.
     """
 
-    def get_stock_data(self, ticker: str) -> pd.DataFrame:
+    def get_stock_data(self, ticker: str, defer_ingest: bool = False) -> pd.DataFrame:
         """
         Fetch and process historic stock market data for the specified ticker symbol.
 
         Args:
             ticker (str): The stock symbol/ticker.
+            defer_ingest (bool): If True, return the data without writing it to the database, leaving the caller
+                to ingest it, e.g. in a batch with other tickers.
 
         Returns:
             pd.DataFrame: DataFrame containing the historic stock market data with columns
@@ -44,7 +46,7 @@ class StockPriceFetcher(AlphaVantageAPI):
             'outputsize': 'full',
         }
         url = self.build_url_request(**kwargs)
-        log.info(f"Requesting DAILY data for ticker {ticker} from AlphaVantage.")
+        log.info("Requesting DAILY data for ticker %s from AlphaVantage.", ticker)
 
         try:
             # Make API request
@@ -66,27 +68,29 @@ class StockPriceFetcher(AlphaVantageAPI):
             raise Exception(f"Failed to extract data for ticker {ticker}: {str(e)}")
 
         try:
-            # Convert time series data to DataFrame
-            df = pd.DataFrame(time_series_data).T
+            # Convert time series data to DataFrame, one row per date
+            df = pd.DataFrame.from_dict(time_series_data, orient='index')
 
             # Rename columns for clarity
             df.columns = ["OPEN", "HIGH", "LOW", "CLOSE", "VOLUME"]
 
-            # Convert data types to numeric
-            df = df.apply(pd.to_numeric, errors='coerce')
+            # Convert data types to numeric, prices stay float64 so they are written to sqlite exactly
+            for col in ("OPEN", "HIGH", "LOW", "CLOSE"):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            df["VOLUME"] = pd.to_numeric(df["VOLUME"], errors='coerce', downcast='integer')
 
             # Reset index and rename it to 'timestamp'
             df.reset_index(inplace=True)
             df.rename(columns={'index': 'timestamp'}, inplace=True)
 
             # Convert 'timestamp' column to datetime
-            df['TIMESTAMP'] = pd.to_datetime(df['timestamp'])
+            df['TIMESTAMP'] = pd.to_datetime(df['timestamp'], format='%Y-%m-%d', cache=True)
             df.drop(columns=['timestamp'], inplace=True)
 
             # Add 'TICKER' column with the ticker symbol
             df.insert(loc=1, column='TICKER', value=ticker.upper())
 
-            log.info(f"Successfully fetched and processed data for ticker {ticker}.")
+            log.info("Successfully fetched and processed data for ticker %s.", ticker)
 
             # Reorder df columns
             df = df[['TIMESTAMP', 'TICKER', 'OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']]
@@ -95,6 +99,9 @@ class StockPriceFetcher(AlphaVantageAPI):
             log.error(f"Failed to process data for ticker {ticker}: {str(e)}")
             raise Exception(f"Data processing error for ticker {ticker}: {str(e)}")
 
+        if defer_ingest:
+            return df
+
         try:
             self.ingest_dataframe(df=df, database=StockData)
         except Exception as e:
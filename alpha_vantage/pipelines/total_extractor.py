@@ -1,9 +1,14 @@
 import logging
+from typing import Callable, Dict, List, Type
+
+import pandas as pd
+from sqlite_forge.database import SqliteDatabase
 
 from alpha_vantage.pipelines import (EconomicIndicatorsFetcher,
                                      FederalFundsFetcher, FinancialDataFetcher,
                                      NewsSentimentFetcher, StockPriceFetcher,
                                      TreasuryYieldFetcher)
+from alpha_vantage.tables import FinancialData, SentimentData, StockData
 
 log = logging.getLogger(__name__)
 
@@ -30,3 +35,58 @@ class TotalDataFetcher(
             **kwargs: Arbitrary keyword arguments.
         """
         super().__init__(*args, **kwargs)
+
+    @property
+    def ticker_fetchers(self) -> Dict[Type[SqliteDatabase], Callable[..., pd.DataFrame]]:
+        """
+        Return the per-ticker fetch methods, keyed on the table each one populates.
+
+        Returns:
+            Dict[Type[SqliteDatabase], Callable[..., pd.DataFrame]]: The fetch method for each table.
+        """
+        return {
+            StockData: self.get_stock_data,
+            SentimentData: self.get_sentiment_data,
+            FinancialData: self.get_financial_data,
+        }
+
+    def fetch_all_for_ticker(self, ticker: str) -> Dict[Type[SqliteDatabase], pd.DataFrame]:
+        """
+        Fetch stock prices, news sentiment and financial data for a ticker concurrently.
+
+        The fetches are independent and I/O bound, so each runs on its own thread pinned to a distinct active
+        API key, and the wall-clock time is bounded by the slowest one. With fewer active keys than fetches,
+        the fetches share the available keys and partly run one after another. Each writes to its own table.
+
+        Args:
+            ticker (str): The stock ticker symbol.
+
+        Returns:
+            Dict[Type[SqliteDatabase], pd.DataFrame]: The data fetched for each table.
+        """
+        with self._pinned_executor(max_workers=len(self.ticker_fetchers)) as executor:
+            futures = {database: executor.submit(fetch, ticker) for database, fetch in self.ticker_fetchers.items()}
+            return {database: future.result() for database, future in futures.items()}
+
+    def fetch_many(self, tickers: List[str]) -> Dict[Type[SqliteDatabase], pd.DataFrame]:
+        """
+        Fetch stock prices, news sentiment and financial data for several tickers, ingesting each table once.
+
+        The per-ticker fetches skip their own ingest, and the results are concatenated and written with a
+        single transaction per table. A ticker that fails to fetch is logged and left out of the batch.
+
+        Args:
+            tickers (List[str]): The stock ticker symbols.
+
+        Returns:
+            Dict[Type[SqliteDatabase], pd.DataFrame]: The combined data for each table.
+        """
+        dfs = {database: [] for database in self.ticker_fetchers}
+        for ticker in tickers:
+            for database, fetch in self.ticker_fetchers.items():
+                try:
+                    dfs[database].append(fetch(ticker, defer_ingest=True))
+                except Exception as e:
+                    log.error(f"Failed to fetch {database.DEFAULT_PATH} data for ticker {ticker}: {str(e)}")
+
+        return {database: self.batch_ingest(dfs=frames, database=database) for database, frames in dfs.items()}
@@ -1,5 +1,7 @@
+from contextlib import closing
 from typing import Dict, List
 
+import pandas as pd
 from sqlite_forge.database import SqliteDatabase
 
 
@@ -15,3 +17,17 @@ class SentimentData(SqliteDatabase):
         "SOURCE": "VARCHAR(50)",
         "OVERALL_SENTIMENT_SCORE": "DECIMAL(1,7)",
     }
+
+    def existing_keys(self, ticker: str) -> pd.DataFrame:
+        """
+        Return the primary key values already stored for a ticker.
+
+        Args:
+            ticker (str): The stock ticker symbol.
+
+        Returns:
+            pd.DataFrame: The DATE, TIME, TITLE and SOURCE of every stored row for the ticker.
+        """
+        query = f"SELECT DATE, TIME, TITLE, SOURCE FROM {self.db_name} WHERE TICKER = ?"
+        with closing(self.conn) as conn:
+            return pd.read_sql_query(query, conn, params=(ticker.upper(),))
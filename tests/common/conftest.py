@@ -0,0 +1,5 @@
+try:
+    import orb.common.vpn.pia  # noqa: F401
+except ImportError:
+    # The key manager, and so the API module, imports the PIA VPN client
+    collect_ignore = ['test_api.py', 'test_ingest.py', 'test_key_manager.py']
@@ -0,0 +1,63 @@
+import threading
+import time
+import urllib.parse
+
+import pytest
+
+from alpha_vantage.common.api import AlphaVantageAPI
+from alpha_vantage.common.key_manager import APIKeyManager
+
+
+@pytest.fixture
+def api(new_manager, monkeypatch):
+    monkeypatch.setattr(AlphaVantageAPI, 'CACHE_DIR', None)
+    return new_manager(AlphaVantageAPI)
+
+
+@pytest.fixture
+def requests_made(monkeypatch):
+    """Replace the HTTP request with one that echoes its parameters and records the thread and key used."""
+    made = []
+
+    def make_request(self, url, api_key=None):
+        params = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query))
+        made.append((threading.get_ident(), params['apikey'], api_key))
+        # Finish later requests first so results complete out of order
+        time.sleep(0.01 * (5 - int(params['page'])))
+        return params
+
+    monkeypatch.setattr(APIKeyManager, 'make_request', make_request)
+    return made
+
+
+def test_results_keep_request_order(api, requests_made):
+    responses = api.make_requests([{'function': 'TEST', 'page': page} for page in range(5)])
+
+    assert [response['page'] for response in responses] == ['0', '1', '2', '3', '4']
+
+
+def test_each_worker_uses_its_own_key(api, requests_made):
+    api.make_requests([{'function': 'TEST', 'page': page} for page in range(5)])
+
+    keys_by_thread = {}
+    for thread, url_key, api_key in requests_made:
+        assert url_key == api_key, "The request should be scheduled on the key the URL was built with"
+        keys_by_thread.setdefault(thread, set()).add(api_key)
+
+    assert all(len(keys) == 1 for keys in keys_by_thread.values())
+    pinned = [keys.pop() for keys in keys_by_thread.values()]
+    assert len(pinned) == len(set(pinned)) > 1
+
+
+def test_workers_are_bounded_by_active_keys(api, requests_made):
+    api.remove_key('KEY3')
+
+    api.make_requests([{'function': 'TEST', 'page': page} for page in range(5)])
+
+    assert {api_key for _, _, api_key in requests_made} <= {'KEY1', 'KEY2'}
+    assert len({thread for thread, _, _ in requests_made}) <= 2
+
+
+def test_unpinned_thread_uses_current_key(api):
+    assert api.request_key == api.api_key
+    assert f"apikey={api.api_key}" in api.build_url_request(function='TEST')
@@ -0,0 +1,109 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from alpha_vantage.common.cache import FileCache
+
+STOCK_URL = "https://www.alphavantage.co/query?apikey=KEY1&function=TIME_SERIES_DAILY&symbol=IBM"
+
+
+def sentiment_url(time_to: datetime, api_key: str = "KEY1") -> str:
+    return (
+        f"https://www.alphavantage.co/query?apikey={api_key}&function=NEWS_SENTIMENT&ticker=IBM"
+        f"&time_from=20220101T0130&time_to={time_to:%Y%m%dT%H%M}"
+    )
+
+
+class Fetcher:
+    """Counts calls and returns a fixed payload."""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.payload
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FileCache(str(tmp_path))
+
+
+def test_miss_then_hit(cache):
+    fetch = Fetcher({'feed': [1, 2, 3]})
+
+    assert cache.get_or_set(STOCK_URL, fetch) == {'feed': [1, 2, 3]}
+    assert cache.get_or_set(STOCK_URL, fetch) == {'feed': [1, 2, 3]}
+
+    assert fetch.calls == 1, "Second request should be served from the cache"
+    assert cache.cache_stats == {'hits': 1, 'misses': 1}
+
+
+def test_key_ignores_api_key(cache):
+    fetch = Fetcher({'data': 1})
+
+    cache.get_or_set(STOCK_URL, fetch)
+    cache.get_or_set(STOCK_URL.replace("KEY1", "KEY2"), fetch)
+
+    assert fetch.calls == 1, "The same request made with another API key should hit"
+
+
+def test_entry_layout(cache, tmp_path):
+    cache.get_or_set(STOCK_URL, Fetcher({'data': 1}))
+
+    entries = list((tmp_path / 'IBM' / 'TIME_SERIES_DAILY').glob('*.json'))
+    assert len(entries) == 1
+
+
+def test_expired_entry_is_refetched(cache, tmp_path):
+    fetch = Fetcher({'data': 1})
+    cache.get_or_set(STOCK_URL, fetch)
+
+    # Age the entry past the TTL
+    entry = next((tmp_path / 'IBM' / 'TIME_SERIES_DAILY').glob('*.json'))
+    stale = time.time() - FileCache.TTL - 60
+    os.utime(entry, (stale, stale))
+
+    cache.get_or_set(STOCK_URL, fetch)
+    assert fetch.calls == 2, "Expired entry should be fetched again"
+
+
+def test_settled_sentiment_window_never_expires(cache, tmp_path):
+    url = sentiment_url(datetime.now() - FileCache.SETTLED_AFTER - timedelta(days=1))
+    fetch = Fetcher({'feed': []})
+    cache.get_or_set(url, fetch)
+
+    entry = next((tmp_path / 'IBM' / 'NEWS_SENTIMENT').glob('*.json'))
+    stale = time.time() - 365 * FileCache.TTL
+    os.utime(entry, (stale, stale))
+
+    cache.get_or_set(url, fetch)
+    assert fetch.calls == 1, "Settled sentiment windows should be kept indefinitely"
+
+
+def test_recent_sentiment_window_expires(cache):
+    assert cache._ttl({'function': 'NEWS_SENTIMENT', 'time_to': f"{datetime.now():%Y%m%dT%H%M}"}) == FileCache.TTL
+
+
+def test_unrecognised_time_to_falls_back_to_ttl(cache):
+    assert cache._ttl({'function': 'NEWS_SENTIMENT', 'time_to': '20220101T013000'}) == FileCache.TTL
+
+
+@pytest.mark.parametrize('payload', [
+    {'Error Message': 'Invalid API call.'},
+    {'Note': 'Thank you for using Alpha Vantage!'},
+    {'Information': 'API rate limit reached.'},
+])
+def test_error_responses_are_not_cached(cache, payload):
+    url = sentiment_url(datetime.now() - FileCache.SETTLED_AFTER - timedelta(days=1))
+    fetch = Fetcher(payload)
+
+    assert cache.get_or_set(url, fetch) == payload
+    cache.get_or_set(url, fetch)
+
+    assert fetch.calls == 2, "Error responses should never be served from the cache"
+    assert cache.cache_stats['hits'] == 0
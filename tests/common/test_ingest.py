@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from alpha_vantage.common.api import ARROW_AVAILABLE, AlphaVantageAPI
+from alpha_vantage.tables import StockData
+
+INGEST_PATHS = [
+    pytest.param(AlphaVantageAPI._ingest_rows, id='executemany'),
+    pytest.param(
+        AlphaVantageAPI._ingest_arrow, id='adbc',
+        marks=pytest.mark.skipif(not ARROW_AVAILABLE, reason="pyarrow and adbc-driver-sqlite are not installed"),
+    ),
+]
+
+
+def stock_frame(dates):
+    return pd.DataFrame({
+        'TIMESTAMP': dates,
+        'TICKER': 'IBM',
+        'OPEN': 101.5,
+        'HIGH': 102.25,
+        'LOW': 99.0,
+        'CLOSE': 101.1,
+        'VOLUME': 1000,
+    })
+
+
+@pytest.fixture
+def database(tmp_path):
+    database_inst = StockData(database_path=str(tmp_path))
+    database_inst.create_table()
+    return database_inst
+
+
+def row_count(database_inst):
+    return database_inst.execute_query(f"SELECT COUNT(*) AS N FROM {database_inst.db_name}")['N'][0]
+
+
+@pytest.mark.parametrize('ingest', INGEST_PATHS)
+def test_second_ingest_writes_nothing(database, ingest):
+    df = stock_frame(['2024-01-02', '2024-01-03', '2024-01-04'])
+
+    assert ingest(df=df, database_inst=database) == 3
+    assert ingest(df=df, database_inst=database) == 0, "Rows with existing primary keys should be skipped"
+    assert row_count(database) == 3
+
+
+@pytest.mark.parametrize('ingest', INGEST_PATHS)
+def test_only_new_rows_are_written(database, ingest):
+    ingest(df=stock_frame(['2024-01-02', '2024-01-03']), database_inst=database)
+
+    assert ingest(df=stock_frame(['2024-01-03', '2024-01-04']), database_inst=database) == 1
+    assert row_count(database) == 3
+
+
+@pytest.mark.parametrize('ingest', INGEST_PATHS)
+def test_existing_rows_are_not_overwritten(database, ingest):
+    ingest(df=stock_frame(['2024-01-02']), database_inst=database)
+    ingest(df=stock_frame(['2024-01-02']).assign(CLOSE=200.0), database_inst=database)
+
+    stored = database.execute_query(f"SELECT CLOSE FROM {database.db_name}")
+    assert stored['CLOSE'].tolist() == [101.1]
@@ -0,0 +1,141 @@
+import json
+import urllib.parse
+from types import SimpleNamespace
+
+import pytest
+
+from alpha_vantage.common import key_manager
+from alpha_vantage.common.key_manager import APIKeyManager
+
+
+@pytest.fixture
+def manager(new_manager):
+    return new_manager(APIKeyManager)
+
+
+def saved_state(manager):
+    with open(manager.STATE_FILE) as file:
+        return json.load(file)
+
+
+def test_set_key_picks_most_requests_left(manager):
+    manager.active_keys.update({'KEY1': 3, 'KEY2': 10, 'KEY3': 5})
+    manager._rebuild_key_heap()
+
+    manager.set_key()
+
+    assert manager.api_key == 'KEY2'
+
+
+def test_set_key_skips_stale_heap_entries(manager):
+    manager.active_keys.update({'KEY1': 3, 'KEY2': 10, 'KEY3': 5})
+    manager._rebuild_key_heap()
+
+    # Each use pushes a fresh entry and leaves the old one behind in the heap
+    for _ in range(6):
+        manager.update_key_usage('KEY2')
+    assert len(manager._key_heap) > len(manager.active_keys)
+
+    manager.set_key()
+
+    assert manager.api_key == 'KEY3'
+
+
+def test_set_key_skips_retired_keys(manager):
+    manager.active_keys.update({'KEY1': 3, 'KEY2': 10, 'KEY3': 5})
+    manager._rebuild_key_heap()
+
+    manager.remove_key('KEY2')
+    manager.set_key()
+
+    assert manager.api_key == 'KEY3'
+
+
+def test_exhausted_key_is_retired_and_saved(manager):
+    manager.active_keys.update({'KEY1': 1, 'KEY2': 10, 'KEY3': 5})
+    manager._rebuild_key_heap()
+    manager.api_key = 'KEY1'
+
+    manager.update_key_usage('KEY1')
+
+    assert manager.api_key == 'KEY2'
+    assert 'KEY1' in manager.expired_keys
+    assert saved_state(manager)['expired_keys'] == ['KEY1'], "Retirement should be written immediately"
+
+
+def test_expired_keys_are_swapped_in_when_none_are_active(manager, api_keys):
+    for api_key in api_keys:
+        manager.remove_key(api_key)
+
+    manager.set_key()
+
+    assert sorted(manager.active_keys) == api_keys
+    assert saved_state(manager) == {'active_keys': api_keys, 'expired_keys': []}
+
+
+class FakeSession:
+    """Returns the queued payloads in turn and records the API key of each request."""
+
+    def __init__(self, payloads):
+        self.payloads = list(payloads)
+        self.keys = []
+
+    def get(self, url, timeout=None):
+        self.keys.append(dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query))['apikey'])
+        payload = self.payloads.pop(0) if len(self.payloads) > 1 else self.payloads[0]
+        return SimpleNamespace(content=json.dumps(payload).encode(), raise_for_status=lambda: None)
+
+    def close(self):
+        pass
+
+
+THROTTLED = {'Information': "Thank you for using Alpha Vantage! Please consider spreading out your free API requests."}
+DATA = {'Time Series (Daily)': {}}
+
+
+@pytest.fixture
+def throttled(manager, monkeypatch):
+    """Stub out the network, rate limiters, backoff sleeps and IP changes of the manager, starting on KEY1."""
+    manager.active_keys.update({'KEY1': 25, 'KEY2': 20, 'KEY3': 15})
+    manager._rebuild_key_heap()
+    manager.set_key()
+
+    sleeps, ip_changes = [], []
+    monkeypatch.setattr(key_manager.time, 'sleep', sleeps.append)
+    monkeypatch.setattr(manager, '_wait_for_slot', lambda api_key: None)
+    monkeypatch.setattr(manager._bucket, 'acquire', lambda tokens=1: None)
+    monkeypatch.setattr(manager, 'change_ip_address', lambda: ip_changes.append(manager.api_key))
+
+    def make_request(*payloads):
+        manager._session = FakeSession(payloads)
+        url = f"https://www.alphavantage.co/query?apikey={manager.api_key}&function=TIME_SERIES_DAILY&symbol=IBM"
+        return manager.make_request(url=url)
+
+    return SimpleNamespace(make_request=make_request, sleeps=sleeps, ip_changes=ip_changes, manager=manager)
+
+
+def test_throttled_request_backs_off_and_retries(throttled):
+    assert throttled.make_request(THROTTLED, DATA) == DATA
+
+    assert throttled.manager._session.keys == ['KEY1', 'KEY1']
+    assert throttled.sleeps == [2]
+    assert throttled.manager.active_keys['KEY1'] == 24
+    assert throttled.ip_changes == []
+
+
+def test_key_throttled_twice_is_retired(throttled):
+    assert throttled.make_request(THROTTLED, THROTTLED, DATA) == DATA
+
+    assert throttled.manager._session.keys == ['KEY1', 'KEY1', 'KEY2']
+    assert 'KEY1' in throttled.manager.expired_keys
+    assert saved_state(throttled.manager)['expired_keys'] == ['KEY1']
+    assert throttled.ip_changes == ['KEY2']
+    assert throttled.manager.active_keys['KEY2'] == 19
+
+
+def test_persistent_throttling_raises(throttled):
+    with pytest.raises(RuntimeError, match="rate limit persisted"):
+        throttled.make_request(THROTTLED)
+
+    assert throttled.manager._session.keys == ['KEY1', 'KEY1', 'KEY2', 'KEY2', 'KEY3', 'KEY3']
+    assert len(throttled.ip_changes) == 3
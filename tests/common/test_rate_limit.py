@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+
+from alpha_vantage.common import rate_limit
+from alpha_vantage.common.rate_limit import TokenBucket
+
+
+class FakeClock:
+    """A monotonic clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock)
+    return clock
+
+
+@pytest.fixture
+def bucket(clock):
+    bucket = TokenBucket(rate=2, capacity=5)
+    bucket.waits = []
+
+    def wait(timeout):
+        # Record the wait and let the fake time pass instead of sleeping
+        bucket.waits.append(timeout)
+        clock.now += timeout
+
+    bucket._condition.wait = wait
+    return bucket
+
+
+def test_burst_up_to_capacity(bucket):
+    for _ in range(5):
+        bucket.acquire()
+    assert bucket.waits == [], "A full bucket should allow a burst of `capacity` requests"
+
+
+def test_waits_for_refill_once_drained(bucket):
+    for _ in range(5):
+        bucket.acquire()
+
+    bucket.acquire()
+    assert bucket.waits == [pytest.approx(0.5)], "Next token should be waited for at 1 / rate seconds"
+
+
+def test_refills_at_rate(bucket, clock):
+    for _ in range(5):
+        bucket.acquire()
+
+    clock.now += 1.5  # Three tokens at 2 per second
+    for _ in range(3):
+        bucket.acquire()
+    assert bucket.waits == []
+
+    bucket.acquire()
+    assert len(bucket.waits) == 1
+
+
+def test_refill_is_capped_at_capacity(bucket, clock):
+    for _ in range(5):
+        bucket.acquire()
+
+    clock.now += 3600
+    for _ in range(5):
+        bucket.acquire()
+    assert bucket.waits == []
+
+    bucket.acquire()
+    assert len(bucket.waits) == 1, "Idle time should not accumulate more than `capacity` tokens"
+
+
+def test_rejects_more_than_capacity(bucket):
+    with pytest.raises(ValueError):
+        bucket.acquire(6)
+
+
+def test_limits_concurrent_threads():
+    bucket = TokenBucket(rate=50, capacity=2)
+
+    def worker():
+        for _ in range(2):
+            bucket.acquire()
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Two tokens are available up front, the other four refill at 50 per second
+    assert time.monotonic() - start >= 4 / 50 - 0.01
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def api_keys():
+    return ['KEY1', 'KEY2', 'KEY3']
+
+
+@pytest.fixture
+def state_file(tmp_path, api_keys):
+    path = tmp_path / 'api_keys.json'
+    path.write_text(json.dumps({'active_keys': api_keys, 'expired_keys': []}))
+    return str(path)
+
+
+@pytest.fixture
+def new_manager(state_file):
+    """Return a factory creating a fresh instance of a key manager class, loaded from the test state file."""
+    # Imported here as the key manager needs the PIA VPN client, which only some test modules require
+    from alpha_vantage.common.key_manager import load_key_config
+
+    created = []
+
+    def new(cls):
+        load_key_config.cache_clear()
+        cls._instance = None
+        manager = cls(api_config_path=state_file)
+        created.append(manager)
+        return manager
+
+    yield new
+
+    for manager in created:
+        manager.close()
+        type(manager)._instance = None
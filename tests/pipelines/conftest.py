@@ -0,0 +1,18 @@
+import pytest
+
+try:
+    import orb.common.vpn.pia  # noqa: F401
+except ImportError:
+    # Every fetcher inherits from the key manager, which imports the PIA VPN client
+    collect_ignore_glob = ['test_*.py']
+else:
+    from alpha_vantage.common import api
+
+
+@pytest.fixture
+def database_path(tmp_path, monkeypatch):
+    """Point the fetchers at empty tables under a temporary directory, bypassing the response cache."""
+    monkeypatch.setattr(api, 'DATABASE_PATH', str(tmp_path))
+    monkeypatch.setattr(api.AlphaVantageAPI, '_database_handlers', {})
+    monkeypatch.setattr(api.AlphaVantageAPI, 'CACHE_DIR', None)
+    return str(tmp_path)
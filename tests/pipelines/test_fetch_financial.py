@@ -1,9 +1,10 @@
-from unittest.mock import MagicMock
+import math
+import urllib.parse
 
-import pandas as pd
 import pytest
 
 from alpha_vantage.pipelines import FinancialDataFetcher
+from alpha_vantage.tables import FinancialData
 
 EXPECTED_COLUMNS = [
     'FISCAL_DATE_ENDING', 'TICKER', 'TOTAL_ASSETS', 'TOTAL_CURRENT_ASSETS',
@@ -38,20 +39,74 @@ EXPECTED_COLUMNS = [
 ]
 
 
-@pytest.fixture(scope="module")
-def setup_dataframe():
-    # Create an instance of the data fetcher
-    financial_data = FinancialDataFetcher()
+def columns_from(first, until=None):
+    """Return the expected columns from `first` up to, but excluding, `until`."""
+    end = EXPECTED_COLUMNS.index(until) if until else None
+    return EXPECTED_COLUMNS[EXPECTED_COLUMNS.index(first):end]
 
-    mock_data = {col: [1] if col != 'TICKER' else ['IBM'] for col in EXPECTED_COLUMNS}
-    mocked_df = pd.DataFrame(mock_data)
 
-    # Mock the method to return this DataFrame
-    financial_data.build_quarterly_fundamental_data = MagicMock(return_value=mocked_df)
+# Each statement reports a contiguous block of the schema's columns
+STATEMENT_COLUMNS = {
+    'BALANCE_SHEET': columns_from('TOTAL_ASSETS', 'GROSS_PROFIT'),
+    'INCOME_STATEMENT': columns_from('GROSS_PROFIT', 'OPERATING_CASHFLOW'),
+    'CASH_FLOW': columns_from('OPERATING_CASHFLOW', 'REPORTED_DATE'),
+    'EARNINGS': columns_from('REPORTED_DATE'),
+}
+TEXT_FIELDS = {'REPORTED_DATE': '2024-04-20', 'REPORT_TIME': 'post-market'}
 
-    # Use the mocked method to generate a DataFrame
-    df = financial_data.build_quarterly_fundamental_data(ticker='IBM')
-    return df
+
+def api_field(col):
+    """Return the camelCase API field name for a column, e.g. 'NET_INCOME_x' to 'netIncome'."""
+    first, *rest = col.removesuffix('_x').removesuffix('_y').split('_')
+    return first.lower() + ''.join(part.capitalize() for part in rest)
+
+
+def report(function, fiscal_date, **values):
+    """Build one API report for a statement, with '1' for every field not given."""
+    row = {'fiscalDateEnding': fiscal_date}
+    if function != 'EARNINGS':
+        row['reportedCurrency'] = 'USD'
+    for col in STATEMENT_COLUMNS[function]:
+        row[api_field(col)] = values.get(col, TEXT_FIELDS.get(col, '1'))
+    return row
+
+
+# The balance sheet reports the latest quarter twice, each time with a value missing from the other
+RESPONSES = {
+    'BALANCE_SHEET': {'quarterlyReports': [
+        report('BALANCE_SHEET', '2024-03-31', TOTAL_ASSETS='100', INVENTORY='None'),
+        report('BALANCE_SHEET', '2024-03-31', TOTAL_ASSETS='90', INVENTORY='5'),
+        report('BALANCE_SHEET', '2023-12-31', GOODWILL='None'),
+    ]},
+    'INCOME_STATEMENT': {'quarterlyReports': [
+        report('INCOME_STATEMENT', '2024-03-31', NET_INCOME_x='3'),
+        report('INCOME_STATEMENT', '2023-12-31', NET_INCOME_x='2'),
+    ]},
+    'CASH_FLOW': {'quarterlyReports': [
+        report('CASH_FLOW', '2024-03-31', NET_INCOME_y='4'),
+        report('CASH_FLOW', '2023-12-31', NET_INCOME_y='5'),
+    ]},
+    'EARNINGS': {'quarterlyEarnings': [
+        report('EARNINGS', '2024-03-31', REPORTED_E_P_S='1.5'),
+        report('EARNINGS', '2023-12-31', REPORTED_E_P_S='None'),
+    ]},
+}
+
+
+@pytest.fixture
+def financial_data(new_manager, monkeypatch):
+    financial_data = new_manager(FinancialDataFetcher)
+
+    def make_request(url, api_key=None):
+        return RESPONSES[dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query))['function']]
+
+    monkeypatch.setattr(financial_data, 'make_request', make_request)
+    return financial_data
+
+
+@pytest.fixture
+def setup_dataframe(financial_data):
+    return financial_data.get_financial_data(ticker='ibm', defer_ingest=True)
 
 
 def test_columns_exist(setup_dataframe):
@@ -62,3 +117,33 @@ def test_columns_exist(setup_dataframe):
 
 def test_dataframe_length(setup_dataframe):
     assert len(setup_dataframe) > 0, "DataFrame should not be empty"
+
+
+def test_columns_match_schema(setup_dataframe):
+    assert list(setup_dataframe.columns) == list(FinancialData.DEFAULT_SCHEMA)
+
+
+def test_one_row_per_fiscal_date(setup_dataframe):
+    assert setup_dataframe['FISCAL_DATE_ENDING'].tolist() == ['2024-03-31', '2023-12-31']
+    assert set(setup_dataframe['TICKER']) == {'IBM'}
+
+
+def test_duplicated_date_keeps_column_max(setup_dataframe):
+    latest = setup_dataframe.iloc[0]
+
+    assert latest['TOTAL_ASSETS'] == 100
+    assert latest['INVENTORY'] == 5, "A value missing from one duplicate should be taken from the other"
+
+
+def test_statement_values_are_aligned(setup_dataframe):
+    assert setup_dataframe['NET_INCOME_x'].tolist() == [3, 2]
+    assert setup_dataframe['NET_INCOME_y'].tolist() == [4, 5]
+    assert setup_dataframe['REPORTED_DATE'].tolist() == ['2024-04-20', '2024-04-20']
+
+
+def test_none_values_are_missing(setup_dataframe):
+    previous = setup_dataframe.iloc[1]
+
+    assert math.isnan(previous['GOODWILL'])
+    assert math.isnan(previous['REPORTED_E_P_S'])
+    assert setup_dataframe.iloc[0]['REPORTED_E_P_S'] == 1.5
@@ -0,0 +1,82 @@
+import pytest
+
+from alpha_vantage.pipelines import NewsSentimentFetcher
+from alpha_vantage.tables import SentimentData
+
+YEAR = 2024
+
+
+def article(time_published, title, source, score):
+    return {'time_published': time_published, 'title': title, 'source': source, 'overall_sentiment_score': score}
+
+
+# One response per half-year window. The first article is reported three times with different scores.
+RESPONSES = [
+    {'feed': [
+        article('20240102T100000', 'Earnings beat', 'Reuters', 0.2),
+        article('20240102T100000', 'Earnings beat', 'Reuters', -0.7),
+        article('20240103T093000', 'New CEO', 'Bloomberg', 0.1),
+    ]},
+    {'feed': [
+        article('20240102T100000', 'Earnings beat', 'Reuters', 0.5),
+        article('20240801T231505', 'Guidance cut', 'Reuters', -0.3),
+    ]},
+]
+
+
+@pytest.fixture
+def fetcher(new_manager, database_path, monkeypatch):
+    fetcher = new_manager(NewsSentimentFetcher)
+    fetcher.requests_made = []
+
+    def make_requests(requests_kwargs):
+        fetcher.requests_made.append(requests_kwargs)
+        return RESPONSES
+
+    monkeypatch.setattr(fetcher, 'make_requests', make_requests)
+    return fetcher
+
+
+def stored_rows(fetcher):
+    database_inst = fetcher.get_database(SentimentData)
+    return database_inst.execute_query(f"SELECT * FROM {database_inst.db_name}")
+
+
+def test_year_requests_both_half_year_windows(fetcher):
+    fetcher.get_sentiment_data('ibm', year=YEAR, defer_ingest=True)
+
+    [requests_kwargs] = fetcher.requests_made
+    assert [(params['time_from'], params['time_to']) for params in requests_kwargs] == [
+        ('20240101T0130', '20240630T0130'), ('20240630T0130', '20241231T0130'),
+    ]
+    assert all(params['ticker'] == 'ibm' for params in requests_kwargs)
+
+
+def test_most_extreme_score_is_kept(fetcher):
+    df = fetcher.get_sentiment_data('ibm', year=YEAR, defer_ingest=True)
+
+    scores = df.set_index('TITLE')['OVERALL_SENTIMENT_SCORE'].to_dict()
+    assert scores == {'Earnings beat': -0.7, 'New CEO': 0.1, 'Guidance cut': -0.3}
+
+
+def test_dates_and_times_are_formatted(fetcher):
+    df = fetcher.get_sentiment_data('ibm', year=YEAR, defer_ingest=True)
+
+    assert list(df.columns) == list(SentimentData.DEFAULT_SCHEMA)
+    assert sorted(zip(df['DATE'], df['TIME'])) == [
+        ('2024-01-02', '10:00:00'), ('2024-01-03', '09:30:00'), ('2024-08-01', '23:15:05'),
+    ]
+    assert set(df['TICKER']) == {'IBM'}
+
+
+def test_second_run_writes_nothing(fetcher, monkeypatch):
+    fetcher.get_sentiment_data('ibm', year=YEAR)
+    assert len(stored_rows(fetcher)) == 3
+
+    ingested = []
+    monkeypatch.setattr(fetcher, 'ingest_dataframe', lambda df, database: ingested.append(df))
+    df = fetcher.get_sentiment_data('ibm', year=YEAR)
+
+    assert len(df) == 3
+    assert ingested == [], "Rows already stored for the ticker should not be sent to the database"
+    assert len(stored_rows(fetcher)) == 3